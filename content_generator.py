@@ -3,67 +3,340 @@
 
 import google.generativeai as genai
 import json
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Persistent caches for Gemini replies, so repeated requests survive restarts.
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "savi_ai")
+DEVIATION_CACHE_PATH = os.path.join(CACHE_DIR, "deviation.sqlite")
+SLIDE_CACHE_PATH = os.path.join(CACHE_DIR, "slides.sqlite")
+SLIDE_CACHE_TTL_S = 86400
+DEVIATION_MEMO_SIZE = 256
+# Speech windows whose word sets overlap at least this much count as a hit.
+DEVIATION_FUZZY_THRESHOLD = 0.92
+# A stalled chunk must not hold up the periodic check cadence.
+DEVIATION_TIMEOUT_S = 2.0
+# Hard deadline on the whole streamed call, so a stalled stream that could
+# not be cancelled still ends and frees its thread eventually.
+DEVIATION_DEADLINE_S = 3 * DEVIATION_TIMEOUT_S
+
+# Upper bound on concurrent Gemini requests, shared by all callers to respect rate limits.
+TIER_CONCURRENCY = 10
+_gemini_slots = threading.BoundedSemaphore(TIER_CONCURRENCY)
+
+# --- Prompt Templates ---
+# The fixed instructions come first and the per-call fields last, so the
+# shared prefix is identical across calls.
+_PROMPT_DEVIATION_TMPL = """
+Analyze the following. Has the presenter's speech moved to a new topic not covered by the slide?
+Task: If the speech has clearly shifted to a new topic, respond ONLY with the new topic in up to 10 words. Otherwise, respond with the single word: None.
+Current Slide Content: "{slide_text}"
+Presenter's Speech: "{speech_text}"
+Response:
+"""
+
+_PROMPT_SLIDE_TMPL = """
+You are a factual research assistant creating a presentation slide. Your goal is to be informative and data-driven.
+
+**CRITICAL INSTRUCTIONS:**
+1.  **Title:** Create a clear, factual title directly related to the topic.
+2.  **Bullet Points:** Write 4-5 bullet points. You MUST find and include real, quantifiable data (e.g., financial figures, percentages, statistics) relevant to the topic. For a topic like "Virat Kohli's wealth," you must include his estimated net worth and earnings. For "Google's quarterly earnings," you must include revenue and net income figures.
+3.  **Layout Suggestion:**
+    - If you generate `chart_data`, the layout MUST be 'text_left_visual_right'.
+    - If you do not generate `chart_data`, the layout can be 'text_only' or 'text_left_visual_right'.
+4.  **Chart Data (Conditional):**
+    - If the topic is about finances, statistics, market share, or any quantifiable data, you MUST generate a simple JSON object for a chart summarizing the key data points from your bullet points. Use a 'pie' chart for breakdowns (like earnings sources) or a 'bar' chart for comparisons. For a bar chart, use a simple "values" array, not a complex "datasets" structure.
+    - If the topic is purely qualitative (e.g., "The History of Origami"), this value MUST be null.
+5.  **Image Suggestion (Conditional):**
+    - If you generated `chart_data`, this value MUST be null.
+    - If `chart_data` is null, suggest a simple, direct search query for a relevant icon or image.
+
+Format the entire response as a single JSON object with the keys: "title", "points", "image_suggestion", "layout", and "chart_data".
+
+The presentation topic is: "{topic}".
+"""
+
+# A reply of the word "None" (but not "Nonetheless ..."). While streaming, the word only
+# counts once a non-word character follows it, since the next chunk may extend it.
+_NONE_REPLY = re.compile(r"none\b", re.IGNORECASE)
+_NONE_REPLY_PARTIAL = re.compile(r"none\W", re.IGNORECASE)
+
+def _reads_as_none(text):
+    """True once a partial reply is clearly the word 'None' rather than the start of a longer word."""
+    body = text.strip()
+    if not body:
+        return False
+    last = body.splitlines()[-1].strip()
+    if _NONE_REPLY_PARTIAL.match(last):
+        return True
+    # Trailing whitespace (stripped above) also ends the word
+    return _NONE_REPLY.fullmatch(last) is not None and text != text.rstrip()
+
+def _await_chunk(fn, *args):
+    """Runs one blocking step of a streamed reply, giving up after DEVIATION_TIMEOUT_S.
+
+    Each step gets its own daemon thread, so a step that never returns only strands
+    that thread (until DEVIATION_DEADLINE_S) instead of queueing later checks behind it.
+    """
+    future = Future()
+    def step():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    threading.Thread(target=step, name='deviation', daemon=True).start()
+    return future.result(timeout=DEVIATION_TIMEOUT_S)
+
+def _close_stream(response):
+    """Cancels a streamed reply that is no longer being read, so its connection is released.
+
+    google-generativeai has no public way to do this; its response keeps the raw stream
+    in `_iterator`, which is a cancellable gRPC call with transport='grpc'. This is the
+    only place that touches it. Where it is missing (another transport or SDK version)
+    the stream is left to DEVIATION_DEADLINE_S, and _await_chunk keeps that off callers.
+    """
+    cancel = getattr(getattr(response, '_iterator', None), 'cancel', None)
+    if cancel is None:
+        return
+    try:
+        cancel()
+    except Exception:
+        pass
+
+def _digest(text):
+    """Returns a short, stable hash for a piece of text (case-insensitive)."""
+    return hashlib.blake2b(text.lower().encode('utf-8'), digest_size=16).hexdigest()
+
+def _normalize_topic(topic):
+    return re.sub(r'\s+', ' ', topic).lower().strip()
+
+def _style_digest(style_guide):
+    """Hashes a style guide in a way that is stable across runs (unlike hash())."""
+    return _digest(json.dumps(style_guide or {}, sort_keys=True, default=str))
+
+def _open_cache(path, schema):
+    """Opens (or creates) an on-disk cache. Returns None on failure."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute(schema)
+        db.commit()
+        return db
+    except sqlite3.Error as e:
+        print(f"WARNING: Cache at {path} disabled. Details: {e}")
+        return None
+
+def _word_set(text):
+    return frozenset(re.findall(r"\w+", text.lower()))
+
+def _similarity(a, b):
+    """Jaccard similarity of two word sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
 
 class ContentGenerator:
     def __init__(self, api_key):
         self.api_key = api_key
-        genai.configure(api_key=self.api_key)
+        # gRPC keeps one multiplexed HTTP/2 connection open across requests
+        genai.configure(api_key=self.api_key, transport='grpc')
         self.model = genai.GenerativeModel('gemini-1.5-flash-latest')
 
+        # --- Deviation Cache ---
+        self._cache_lock = threading.Lock()
+        self._deviation_memo = {}
+        self._deviation_recent = deque(maxlen=DEVIATION_MEMO_SIZE)
+        self._deviation_db = _open_cache(DEVIATION_CACHE_PATH,
+                                         "CREATE TABLE IF NOT EXISTS deviation ("
+                                         "slide_hash TEXT, speech_hash TEXT, result TEXT, "
+                                         "PRIMARY KEY (slide_hash, speech_hash))")
+
+        # --- Slide Content Cache ---
+        self._slide_db = _open_cache(SLIDE_CACHE_PATH,
+                                     "CREATE TABLE IF NOT EXISTS slides ("
+                                     "key TEXT PRIMARY KEY, content TEXT, created REAL)")
+        self._stats = {'deviation_hits': 0, 'deviation_misses': 0, 'slide_hits': 0, 'slide_misses': 0}
+
+    def warm_up(self):
+        """Sends a tiny request so the connection is already established before the first real call."""
+        try:
+            with _gemini_slots:
+                self.model.generate_content("Hi", generation_config={'max_output_tokens': 1})
+        except Exception as e:
+            print(f"WARNING: Gemini warm-up request failed: {e}")
+
+    def stats(self):
+        """Returns cache hit/miss counts for this session."""
+        with self._cache_lock:
+            return dict(self._stats)
+
+    def _lookup_deviation(self, slide_hash, speech_hash, speech_words):
+        """Returns (hit, result) for a deviation check, checking memory, disk and near-duplicates."""
+        key = (slide_hash, speech_hash)
+        with self._cache_lock:
+            if key in self._deviation_memo:
+                self._stats['deviation_hits'] += 1
+                return True, self._deviation_memo[key]
+            if self._deviation_db is not None:
+                row = self._deviation_db.execute(
+                    "SELECT result FROM deviation WHERE slide_hash = ? AND speech_hash = ?", key).fetchone()
+                if row is not None:
+                    result = row[0] or None
+                    self._deviation_memo[key] = result
+                    self._stats['deviation_hits'] += 1
+                    return True, result
+            for cached_slide_hash, cached_words, result in self._deviation_recent:
+                if cached_slide_hash == slide_hash and _similarity(speech_words, cached_words) > DEVIATION_FUZZY_THRESHOLD:
+                    self._stats['deviation_hits'] += 1
+                    return True, result
+            self._stats['deviation_misses'] += 1
+        return False, None
+
+    def _store_deviation(self, slide_hash, speech_hash, speech_words, result):
+        key = (slide_hash, speech_hash)
+        with self._cache_lock:
+            if len(self._deviation_memo) >= DEVIATION_MEMO_SIZE:
+                self._deviation_memo.pop(next(iter(self._deviation_memo)))
+            self._deviation_memo[key] = result
+            self._deviation_recent.append((slide_hash, speech_words, result))
+            if self._deviation_db is not None:
+                try:
+                    self._deviation_db.execute(
+                        "INSERT OR REPLACE INTO deviation VALUES (?, ?, ?)", (*key, result or ""))
+                    self._deviation_db.commit()
+                except sqlite3.Error as e:
+                    print(f"WARNING: Could not write to deviation cache. Details: {e}")
+
+    def _lookup_slide(self, key):
+        """Returns cached slide content for a key, or None if missing or expired."""
+        with self._cache_lock:
+            row = None
+            if self._slide_db is not None:
+                row = self._slide_db.execute("SELECT content, created FROM slides WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[1] > SLIDE_CACHE_TTL_S:
+                self._stats['slide_misses'] += 1
+                return None
+            self._stats['slide_hits'] += 1
+        return json.loads(row[0])
+
+    def _store_slide(self, key, content_json):
+        if self._slide_db is None:
+            return
+        with self._cache_lock:
+            try:
+                self._slide_db.execute("INSERT OR REPLACE INTO slides VALUES (?, ?, ?)",
+                                       (key, json.dumps(content_json), time.time()))
+                self._slide_db.commit()
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"WARNING: Could not write to slide cache. Details: {e}")
+
     def _extract_json(self, text):
         """A robust function to extract a JSON object from a string."""
+        _, sep, rest = text.partition('{')
+        body, sep2, _ = rest.rpartition('}')
+        if not (sep and sep2):
+            print("ERROR: Could not extract JSON from response. No JSON object found.")
+            return None
+        json_str = '{' + body + '}'
         try:
-            start_index = text.index('{')
-            end_index = text.rindex('}') + 1
-            json_str = text[start_index:end_index]
+            if orjson is not None:
+                try:
+                    return orjson.loads(json_str)
+                except orjson.JSONDecodeError:
+                    pass  # Fall through to the more lenient stdlib parser.
             return json.loads(json_str)
-        except (ValueError, json.JSONDecodeError) as e:
-            print(f"ERROR: Could not extract or parse JSON from response. Details: {e}")
+        except json.JSONDecodeError as e:
+            print(f"ERROR: Could not parse JSON from response. Details: {e}")
             return None
 
     def check_for_deviation(self, slide_text, speech_text):
-        """Checks if the user's speech has deviated from the slide's content."""
-        prompt = f"""
-        Analyze the following. Has the presenter's speech moved to a new topic not covered by the slide?
-        Current Slide Content: "{slide_text}"
-        Presenter's Speech: "{speech_text}"
-        Task: If the speech has clearly shifted to a new topic, respond ONLY with the new topic in up to 10 words. Otherwise, respond with the single word: None.
-        Response:
         """
+        Checks if the user's speech has deviated from the slide's content.
+        Returns the new topic, None if there is no deviation, or False if the check itself failed.
+        """
+        slide_hash, speech_hash = _digest(slide_text), _digest(speech_text)
+        speech_words = _word_set(speech_text)
+        hit, cached = self._lookup_deviation(slide_hash, speech_hash, speech_words)
+        if hit:
+            return cached
+        new_topic = self._deviation_raw(slide_text, speech_text)
+        if new_topic is not False:
+            self._store_deviation(slide_hash, speech_hash, speech_words, new_topic)
+        return new_topic
+
+    def _deviation_raw(self, slide_text, speech_text):
+        """Asks Gemini about a deviation. Returns the topic, None, or False if the call failed."""
+        prompt = _PROMPT_DEVIATION_TMPL.format_map({'slide_text': slide_text, 'speech_text': speech_text})
+        response = None
         try:
-            response = self.model.generate_content(prompt)
-            new_topic = response.text.strip().splitlines()[-1].strip()
-            if new_topic.lower() != "none" and len(new_topic) > 0:
-                print(f"--- Deviation Detected. New Topic: {new_topic} ---")
-                return new_topic
-            return None
+            with _gemini_slots:
+                response = _await_chunk(self._start_stream, prompt)
+                reply = self._read_stream(response)
+        except FutureTimeoutError:
+            print("WARNING: Deviation check timed out.")
+            return False
         except Exception:
-            return None
+            return False
+        finally:
+            _close_stream(response)
+        lines = reply.strip().splitlines()
+        new_topic = lines[-1].strip() if lines else ""
+        if new_topic and not _NONE_REPLY.match(new_topic):
+            print(f"--- Deviation Detected. New Topic: {new_topic} ---")
+            return new_topic
+        return None
+
+    def _start_stream(self, prompt):
+        # generate_content(stream=True) blocks until the first chunk arrives
+        return self.model.generate_content(prompt, stream=True, request_options={'timeout': DEVIATION_DEADLINE_S})
+
+    def _read_stream(self, response):
+        """Reads a streamed reply chunk by chunk, stopping as soon as it is clearly the single word 'None'."""
+        # The first chunk is already in hand; iterating the response reads one chunk
+        # ahead before yielding it, so only do that when more text is needed.
+        candidates = response.candidates
+        if candidates and candidates[0].finish_reason:
+            return response.text
+        if _reads_as_none(response.text):
+            return "None"
+        chunks = iter(response)
+        buf = ""
+        while (chunk := _await_chunk(next, chunks, None)) is not None:
+            buf += chunk.text
+            if _reads_as_none(buf):
+                return "None"
+        return buf
 
     def generate_slide_content(self, topic, style_guide):
-        """Generates engaging, data-driven slide content."""
-        prompt = f"""
-        You are a factual research assistant creating a presentation slide. Your goal is to be informative and data-driven.
-        The presentation topic is: "{topic}".
-
-        **CRITICAL INSTRUCTIONS:**
-        1.  **Title:** Create a clear, factual title directly related to the topic.
-        2.  **Bullet Points:** Write 4-5 bullet points. You MUST find and include real, quantifiable data (e.g., financial figures, percentages, statistics) relevant to the topic. For a topic like "Virat Kohli's wealth," you must include his estimated net worth and earnings. For "Google's quarterly earnings," you must include revenue and net income figures.
-        3.  **Layout Suggestion:**
-            - If you generate `chart_data`, the layout MUST be 'text_left_visual_right'.
-            - If you do not generate `chart_data`, the layout can be 'text_only' or 'text_left_visual_right'.
-        4.  **Chart Data (Conditional):**
-            - If the topic is about finances, statistics, market share, or any quantifiable data, you MUST generate a simple JSON object for a chart summarizing the key data points from your bullet points. Use a 'pie' chart for breakdowns (like earnings sources) or a 'bar' chart for comparisons. For a bar chart, use a simple "values" array, not a complex "datasets" structure.
-            - If the topic is purely qualitative (e.g., "The History of Origami"), this value MUST be null.
-        5.  **Image Suggestion (Conditional):**
-            - If you generated `chart_data`, this value MUST be null.
-            - If `chart_data` is null, suggest a simple, direct search query for a relevant icon or image.
-
-        Format the entire response as a single JSON object with the keys: "title", "points", "image_suggestion", "layout", and "chart_data".
-        """
+        """Generates engaging, data-driven slide content, reusing cached content for repeated topics."""
+        key = f"{_digest(_normalize_topic(topic))}:{_style_digest(style_guide)}"
+        content_json = self._lookup_slide(key)
+        if content_json:
+            print(f"Using cached content for topic: {topic}")
+            return content_json
+        content_json = self._generate_slide_content_raw(topic, style_guide)
+        if content_json:
+            self._store_slide(key, content_json)
+        return content_json
+
+    def _generate_slide_content_raw(self, topic, style_guide):
+        """Asks Gemini for slide content and parses the JSON reply."""
+        prompt = _PROMPT_SLIDE_TMPL.format_map({'topic': topic})
         print(f"Generating data-driven content for topic: {topic}...")
         try:
-            response = self.model.generate_content(prompt)
+            with _gemini_slots:
+                response = self.model.generate_content(prompt)
             print(f"DEBUG (generate_slide_content): Raw response from Gemini: '{response.text}'")
             
             content_json = self._extract_json(response.text)
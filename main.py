@@ -11,17 +11,22 @@ automatic workflow.
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import configparser
-import threading
 import queue
+from concurrent.futures import ThreadPoolExecutor
 import os
-from collections import deque
+import hashlib
+import traceback
 
-# Import custom modules
-from theme_analyzer import ThemeAnalyzer
-from voice_processor import VoiceProcessor
-from content_generator import ContentGenerator
-from slide_updater import SlideUpdater
-from visual_generator import VisualGenerator
+# Custom modules pull in Gemini, python-pptx, COM, Whisper and matplotlib.
+# They are imported by Application._late_imports once the window is showing.
+ThemeAnalyzer = load_presentation = VoiceProcessor = ContentGenerator = SlideUpdater = VisualGenerator = None
+
+# Number of transcribed phrases kept for deviation checks.
+SPEECH_BUFFER_LIMIT = 10
+# Minimum amount of new speech (in characters) before the same slide is re-checked.
+MIN_NEW_SPEECH_CHARS = 40
+# How long Stop waits for the voice thread; a model still loading finishes on its own (daemon thread).
+VOICE_JOIN_TIMEOUT_S = 2
 
 class Application(tk.Tk):
     def __init__(self):
@@ -47,26 +52,67 @@ class Application(tk.Tk):
         self.is_checking = False
         self.voice_thread = None
         self.speech_queue = queue.Queue()
-        self.speech_buffer = deque(maxlen=10)
+        self._speech_chunks: list[str] = []
+        self._speech_version = 0
+        self._joined_speech = ("", -1)
+        self._speech_total = 0
+        self._last_speech_hash = None
+        self._last_slide_idx = None
+        self._last_speech_total = 0
         self.periodic_check_id = None
         self.pulse_id = None
         self.generated_slide_indices = set()
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='savi')
 
         # --- Load APIs & Instantiate Core Components ---
         self.api_key, self.pexels_key, self.noun_key, self.noun_secret = self._load_api_keys()
         if not self.api_key:
             self.destroy(); return
-        self.content_generator = ContentGenerator(api_key=self.api_key)
+        self.content_generator = None
         self.slide_updater = None
-        self.visual_generator = VisualGenerator(self.pexels_key, self.noun_key, self.noun_secret)
+        self.visual_generator = None
         
         # --- Create UI ---
         self._create_widgets()
 
         # --- Final Setup ---
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.after(0, self._late_imports)
         self.after(200, self.process_speech_queue)
 
+    def _submit(self, fn, *args):
+        """Runs a blocking task on the worker pool, reporting errors the way a bare thread would."""
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._report_task_error)
+        return future
+
+    @staticmethod
+    def _report_task_error(future):
+        if not future.cancelled() and future.exception():
+            print("ERROR: Background task failed:")
+            traceback.print_exception(future.exception())
+
+    def _late_imports(self):
+        """Imports the core modules and creates their components after the window has appeared."""
+        global ThemeAnalyzer, load_presentation, VoiceProcessor, ContentGenerator, SlideUpdater, VisualGenerator
+        self._update_status_widgets("Loading components...", "#FBBC05", False)
+        self.update_idletasks()
+        try:
+            from theme_analyzer import ThemeAnalyzer, load_presentation
+            from voice_processor import VoiceProcessor
+            from content_generator import ContentGenerator
+            from slide_updater import SlideUpdater
+            from visual_generator import VisualGenerator
+            self.content_generator = ContentGenerator(api_key=self.api_key)
+            self._submit(self.content_generator.warm_up)
+            self.visual_generator = VisualGenerator(self.pexels_key, self.noun_key, self.noun_secret)
+        except Exception as e:
+            self._update_status_widgets("Failed to load components.", "#EA4335", False)
+            messagebox.showerror("Error", f"Failed to load application components: {e}")
+            self.on_closing(); return
+        self.select_button.config(state=tk.NORMAL)
+        self._set_status("Idle", "#BDBDBD")
+
     def _create_widgets(self):
         """Creates and grids all the UI elements."""
         self.grid_columnconfigure(0, weight=1)
@@ -77,7 +123,7 @@ class Application(tk.Tk):
         # --- Top Controls ---
         self.file_label = ttk.Label(main_frame, text="No presentation selected.", style="File.TLabel", wraplength=400)
         self.file_label.grid(row=0, column=0, columnspan=2, sticky="ew")
-        self.select_button = ttk.Button(main_frame, text="Select PowerPoint & Start Show", command=self.select_file_and_start_show)
+        self.select_button = ttk.Button(main_frame, text="Select PowerPoint & Start Show", command=self.select_file_and_start_show, state=tk.DISABLED)
         self.select_button.grid(row=1, column=0, columnspan=2, pady=10, sticky="ew")
         
         self.start_button = ttk.Button(main_frame, text="Start Auto-Enhancer", command=self.start_processing, state=tk.DISABLED)
@@ -140,11 +186,13 @@ class Application(tk.Tk):
             self.file_label.config(text=f"Selected: {os.path.basename(self.pptx_path)}")
             self.generated_slide_indices.clear()
             try:
-                analyzer = ThemeAnalyzer(self.pptx_path)
+                # Parse the deck once and share it between the analyzer and the updater
+                presentation = load_presentation(self.pptx_path)
+                analyzer = ThemeAnalyzer.from_presentation(presentation)
                 self.style_guide = analyzer.get_style()
                 if not self.style_guide:
                     messagebox.showerror("Error", "Could not analyze the presentation theme."); return
-                self.slide_updater = SlideUpdater(self.pptx_path)
+                self.slide_updater = SlideUpdater(self.pptx_path, presentation=presentation)
                 if self.slide_updater.start_presentation_show():
                     self.start_button.config(state=tk.NORMAL)
                     self.manual_generate_button.config(state=tk.NORMAL)
@@ -160,43 +208,79 @@ class Application(tk.Tk):
         self.stop_button.config(state=tk.NORMAL)
         self._set_status("Listening for speech...", "#4285F4", pulse=True)
         self.periodic_check()
-        self.voice_thread = VoiceProcessor(text_callback=lambda text: self.speech_queue.put(text))
+        self.voice_thread = VoiceProcessor(text_callback=lambda text: self.speech_queue.put(text),
+                                           error_callback=lambda message: self._set_status(message, "#EA4335"))
         self.voice_thread.start()
 
     def stop_processing(self):
         if self.periodic_check_id: self.after_cancel(self.periodic_check_id); self.periodic_check_id = None
-        if self.voice_thread and self.voice_thread.is_alive(): self.voice_thread.stop(); self.voice_thread.join()
+        if self.voice_thread and self.voice_thread.is_alive(): self.voice_thread.stop(); self.voice_thread.join(timeout=VOICE_JOIN_TIMEOUT_S)
         self.is_running = False
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self._set_status("Stopped. Ready to start again.", "#34A853")
 
+    def _append_speech(self, text):
+        self._speech_chunks.append(text)
+        self._speech_total += len(text)
+        while len(self._speech_chunks) > SPEECH_BUFFER_LIMIT:
+            self._speech_chunks.pop(0)
+        self._speech_version += 1
+
+    def _clear_speech(self):
+        self._speech_chunks.clear()
+        self._speech_version += 1
+
+    def _recent_speech(self):
+        """Returns the buffered speech as one string, re-joining only when it has changed."""
+        text, version = self._joined_speech
+        if version != self._speech_version:
+            version = self._speech_version
+            text = " ".join(self._speech_chunks)
+            self._joined_speech = (text, version)
+        return text
+
     def process_speech_queue(self):
         try:
-            while not self.speech_queue.empty(): self.speech_buffer.append(self.speech_queue.get_nowait())
-        except queue.Empty: pass
+            # Take everything queued so far under a single lock acquisition
+            with self.speech_queue.mutex:
+                items = list(self.speech_queue.queue)
+                self.speech_queue.queue.clear()
+            for text in items: self._append_speech(text)
         finally: self.after(200, self.process_speech_queue)
 
     def periodic_check(self):
         if self.is_running and not self.is_checking:
             self.is_checking = True
-            check_thread = threading.Thread(target=self.run_deviation_check)
-            check_thread.start()
+            self._submit(self.run_deviation_check)
         if self.is_running:
             self.periodic_check_id = self.after(8000, self.periodic_check)
 
     def run_deviation_check(self):
         try:
-            if not self.slide_updater or len(self.speech_buffer) < 3: return
+            if not self.slide_updater or len(self._speech_chunks) < 3: return
             current_index = self.slide_updater.get_current_slide_index()
             if not current_index: return
-            slide_text = self.slide_updater.get_text_from_slide(current_index)
+            recent_speech = self._recent_speech()
+            # Skip the API call when nothing meaningful was said since the last check of this slide.
+            speech_hash = hashlib.blake2b(recent_speech.encode('utf-8'), digest_size=8).digest()
+            if current_index == self._last_slide_idx:
+                if speech_hash == self._last_speech_hash: return
+                if self._speech_total - self._last_speech_total < MIN_NEW_SPEECH_CHARS: return
+            speech_total = self._speech_total
+            slide_text = self.slide_updater.get_text_from_live_slide(current_index)
+            if not slide_text.strip(): slide_text = self.slide_updater.get_text_from_slide(current_index)
             if not slide_text.strip(): slide_text = "An empty slide."
-            recent_speech = " ".join(self.speech_buffer)
             self._set_status("Analyzing speech vs. slide...", "#FBBC05")
             new_topic = self.content_generator.check_for_deviation(slide_text, recent_speech)
+            if new_topic is False:
+                # The check failed; leave the skip state alone so the next poll retries
+                self._set_status("Listening for speech...", "#4285F4", pulse=True)
+                return
+            self._last_speech_hash, self._last_slide_idx = speech_hash, current_index
+            self._last_speech_total = speech_total
             if new_topic:
-                self.speech_buffer.clear()
+                self._clear_speech()
                 is_update_action = current_index in self.generated_slide_indices
                 # Directly handle the update instead of previewing
                 self.handle_update(new_topic, current_index, is_update_action)
@@ -223,19 +307,21 @@ class Application(tk.Tk):
         action_text = "Updating" if is_update else "Inserting"
         self._set_status(f"New topic '{topic}'. Generating content...", "#FBBC05")
         
-        # Run content generation in a separate thread to keep UI responsive
-        threading.Thread(target=self._generate_and_apply, args=(topic, slide_index, is_update, action_text)).start()
+        # Run content generation on a worker thread to keep UI responsive
+        self._submit(self._generate_and_apply, topic, slide_index, is_update, action_text)
 
     def _generate_and_apply(self, topic, slide_index, is_update, action_text):
         """Helper function to run the blocking tasks in a background thread."""
         content = self.content_generator.generate_slide_content(topic, self.style_guide)
         if content:
+            # Start fetching the chart/icon/image now so it overlaps with the COM work
+            visual_future = self.slide_updater.prefetch_visual(content, self.visual_generator)
             self._set_status(f"{action_text} slide...", "#FBBC05")
             if is_update:
-                self.slide_updater.update_existing_slide(slide_index, content, self.style_guide, self.visual_generator)
+                self.slide_updater.update_existing_slide(slide_index, content, self.style_guide, self.visual_generator, visual_future)
             else:
                 new_slide_index = slide_index + 1
-                self.slide_updater.insert_new_slide_after_current(slide_index, content, self.style_guide, self.visual_generator)
+                self.slide_updater.insert_new_slide_after_current(slide_index, content, self.style_guide, self.visual_generator, visual_future)
                 self.generated_slide_indices.add(new_slide_index)
                 print(f"INFO: New slide at index {new_slide_index} is now being tracked.")
             self._set_status("Listening for speech...", "#4285F4", pulse=True)
@@ -244,6 +330,7 @@ class Application(tk.Tk):
 
     def on_closing(self):
         if self.is_running: self.stop_processing()
+        self._pool.shutdown(wait=False, cancel_futures=True)
         self.destroy()
 
 if __name__ == "__main__":
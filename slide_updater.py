@@ -11,16 +11,85 @@ if the content is data-driven.
 from pptx import Presentation
 import win32com.client
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Constants
 msoTrue = -1
 ppLayoutBlank = 12
 ppAlignCenter = 2
 ppAlignLeft = 1
+msoTextOrientationHorizontal = 1
+WATERMARK_RGB = 0xA0A0A0
+# Slide geometry in points (72 points per inch)
+_TEXT_LEFT = 36           # 0.5"
+_TITLE_TOP = 14.4         # 0.2"
+_TITLE_HEIGHT = 108       # 1.5"
+_BODY_TOP = 129.6         # 1.8"
+_BODY_HEIGHT = 360        # 5"
+_W_TEXT_NARROW = 396      # 5.5", leaves room for a visual
+_W_TEXT_WIDE = 648        # 9"
+_LOGO_LEFT = 14.4         # 0.2"
+_LOGO_TOP = 518.4         # 7.2"
+_LOGO_WIDTH = 144         # 2"
+_LOGO_HEIGHT = 36         # 0.5"
+_VISUAL_LEFT = 432        # 6"
+_VISUAL_TOP = 180         # 2.5"
+_VISUAL_SIZE = 252        # 3.5"
+# How long slide building waits for a prefetched visual before going without one.
+VISUAL_TIMEOUT_S = 10
+
+_visual_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='visual')
+
+# PowerPoint object library (2.12 = Office 16). Generating the early-bound
+# wrappers once lets every COM attribute access skip the IDispatch name lookup;
+# GetActiveObject picks them up automatically once they exist.
+PPT_TYPELIB = ('{91493440-5A91-11CF-8700-00AA0060263B}', 0, 2, 12)
+try:
+    win32com.client.gencache.EnsureModule(*PPT_TYPELIB)
+except Exception as e:
+    print(f"WARNING: PowerPoint type library unavailable, using late binding: {e}")
+
+def _fetch_visual(content_json, visual_generator):
+    """Returns a path to the slide's visual, prioritizing chart data over icons and images."""
+    visual_path = None
+    if content_json.get('chart_data'):
+        visual_path = visual_generator.create_chart(content_json['chart_data'])
+    elif content_json.get('image_suggestion'):
+        visual_path = visual_generator.get_icon(content_json['image_suggestion'])
+        if not visual_path:
+            visual_path = visual_generator.get_image(content_json['image_suggestion'])
+    return visual_path
+
+def _slide_text(prs, slide_index):
+    """Reads the text of one slide from a parsed presentation."""
+    all_text = []
+    try:
+        if not (0 < slide_index <= len(prs.slides)): return ""
+        slide = prs.slides[slide_index - 1]
+        for shape in slide.shapes:
+            if hasattr(shape, "text_frame") and shape.text_frame.text:
+                all_text.append(shape.text_frame.text)
+        return "\n".join(all_text)
+    except Exception as e:
+        print(f"ERROR: Could not extract text from slide {slide_index}: {e}"); return ""
 
 class SlideUpdater:
-    def __init__(self, pptx_path):
+    def __init__(self, pptx_path, presentation=None):
         self.pptx_path = os.path.abspath(pptx_path)
+        # Parsed copy of the file on disk, reloaded whenever its mtime changes.
+        # A caller that has already parsed the file can hand it over to skip the first parse.
+        self._prs_cache = presentation
+        self._prs_mtime = os.stat(self.pptx_path).st_mtime_ns if presentation is not None else None
+        self._slide_texts = {}
+
+    def _prs(self):
+        """Returns the parsed presentation, re-parsing only if the file was saved since."""
+        mtime_ns = os.stat(self.pptx_path).st_mtime_ns
+        if self._prs_cache is None or self._prs_mtime != mtime_ns:
+            self._prs_cache = Presentation(self.pptx_path)
+            self._prs_mtime = mtime_ns
+            self._slide_texts = {}
+        return self._prs_cache
 
     def _get_active_presentation(self):
         try:
@@ -33,7 +102,7 @@ class SlideUpdater:
 
     def start_presentation_show(self):
         try:
-            app = win32com.client.Dispatch("PowerPoint.Application")
+            app = win32com.client.gencache.EnsureDispatch("PowerPoint.Application")
             app.Visible = msoTrue
             presentation = app.Presentations.Open(self.pptx_path)
             presentation.SlideShowSettings.Run()
@@ -48,40 +117,49 @@ class SlideUpdater:
             except Exception: return None
         return None
 
-    def get_text_from_slide(self, slide_index):
-        if not os.path.exists(self.pptx_path): return ""
+    def get_text_from_live_slide(self, slide_index):
+        """Reads slide text straight from the running PowerPoint, including unsaved edits."""
+        active_presentation = self._get_active_presentation()
+        if not active_presentation: return ""
         all_text = []
         try:
-            prs = Presentation(self.pptx_path)
-            if not (0 < slide_index <= len(prs.slides)): return ""
-            slide = prs.slides[slide_index - 1]
-            for shape in slide.shapes:
-                if hasattr(shape, "text_frame") and shape.text_frame.text:
-                    all_text.append(shape.text_frame.text)
+            for shape in active_presentation.Slides(slide_index).Shapes:
+                if shape.HasTextFrame and shape.TextFrame.HasText:
+                    all_text.append(shape.TextFrame.TextRange.Text)
             return "\n".join(all_text)
         except Exception as e:
-            print(f"ERROR: Could not extract text from slide {slide_index}: {e}"); return ""
+            print(f"ERROR: Could not read live text from slide {slide_index}: {e}"); return ""
+
+    def get_text_from_slide(self, slide_index):
+        try: prs = self._prs()
+        except Exception as e:
+            print(f"ERROR: Could not open presentation {self.pptx_path}: {e}"); return ""
+        if slide_index not in self._slide_texts:
+            self._slide_texts[slide_index] = _slide_text(prs, slide_index)
+        return self._slide_texts[slide_index]
 
-    def _add_content_to_slide(self, target_slide, content_json, style_guide, visual_generator):
+    def prefetch_visual(self, content_json, visual_generator):
+        """Starts fetching the slide's visual in the background and returns a Future for its path."""
+        return _visual_pool.submit(_fetch_visual, content_json, visual_generator)
+
+    def _add_content_to_slide(self, target_slide, content_json, style_guide, visual_generator, visual_future=None):
         """A helper function to add styled text and visuals to a given slide."""
         layout = content_json.get('layout', 'text_left_visual_right')
         print(f"INFO: Building slide with layout: '{layout}'")
 
-        # --- NEW: Prioritize chart data over other visuals ---
-        visual_path = None
-        if content_json.get('chart_data'):
-            visual_path = visual_generator.create_chart(content_json['chart_data'])
-        elif content_json.get('image_suggestion'):
-            visual_path = visual_generator.get_icon(content_json['image_suggestion'])
-            if not visual_path:
-                visual_path = visual_generator.get_image(content_json['image_suggestion'])
-        
-        # Determine text box width based on whether a visual will be present
-        inch_to_points = lambda i: i * 72
-        text_box_width = inch_to_points(5.5) if visual_path else inch_to_points(9)
+        if visual_future is None:
+            visual_future = self.prefetch_visual(content_json, visual_generator)
+
+        # Lay out text for the visual we expect; the fetch keeps running meanwhile
+        expects_visual = bool(content_json.get('chart_data') or content_json.get('image_suggestion'))
+        text_box_width = _W_TEXT_NARROW if expects_visual else _W_TEXT_WIDE
+
+        # Bind COM members used repeatedly below, saving a dispatch lookup per access
+        shapes = target_slide.Shapes
+        add_textbox = shapes.AddTextbox
 
         # Add Title
-        title_box = target_slide.Shapes.AddTextbox(1, inch_to_points(0.5), inch_to_points(0.2), text_box_width, inch_to_points(1.5))
+        title_box = add_textbox(msoTextOrientationHorizontal, _TEXT_LEFT, _TITLE_TOP, text_box_width, _TITLE_HEIGHT)
         title_range = title_box.TextFrame.TextRange
         title_range.Text = content_json.get('title', 'New Topic')
         title_font = title_range.Font
@@ -89,52 +167,74 @@ class SlideUpdater:
         title_font.Size = int(style_guide.get('title_font_size', 32))
         title_font.Bold = msoTrue
         title_font.Color.RGB = int(style_guide['primary_color_rgb'], 16)
-        title_range.ParagraphFormat.Alignment = ppAlignCenter if not visual_path else ppAlignLeft
+        title_format = title_range.ParagraphFormat
+        title_format.Alignment = ppAlignCenter if not expects_visual else ppAlignLeft
 
         # Add Body
-        body_box = target_slide.Shapes.AddTextbox(1, inch_to_points(0.5), inch_to_points(1.8), text_box_width, inch_to_points(5))
-        body_frame = body_box.TextFrame
-        body_frame.TextRange.Text = ""
-        for point_text in content_json.get('points', []):
-            p = body_frame.TextRange.InsertAfter(point_text + "\r\n")
-            p.ParagraphFormat.Bullet.Visible = msoTrue
-            p.Font.Name = style_guide.get('body_font_name', 'Calibri')
-            p.Font.Size = int(style_guide.get('body_font_size', 18))
-            p.Font.Color.RGB = int(style_guide['accent_color_rgb'], 16)
-        body_frame.TextRange.ParagraphFormat.Alignment = ppAlignLeft
+        body_box = add_textbox(msoTextOrientationHorizontal, _TEXT_LEFT, _BODY_TOP, text_box_width, _BODY_HEIGHT)
+        # Set all bullets in one assignment and style the whole range at once
+        body_range = body_box.TextFrame.TextRange
+        body_range.Text = "\r\n".join(content_json.get('points', []))
+        body_font = body_range.Font
+        body_font.Name = style_guide.get('body_font_name', 'Calibri')
+        body_font.Size = int(style_guide.get('body_font_size', 18))
+        body_font.Color.RGB = int(style_guide['accent_color_rgb'], 16)
+        body_format = body_range.ParagraphFormat
+        body_format.Bullet.Visible = msoTrue
+        body_format.Alignment = ppAlignLeft
         
         # Add Branding Watermark
-        logo_box = target_slide.Shapes.AddTextbox(1, inch_to_points(0.2), inch_to_points(7.2), inch_to_points(2), inch_to_points(0.5))
-        logo_box.TextFrame.TextRange.Text = "Updated live by Savi.ai"
-        logo_font = logo_box.TextFrame.TextRange.Font
+        logo_box = add_textbox(msoTextOrientationHorizontal, _LOGO_LEFT, _LOGO_TOP, _LOGO_WIDTH, _LOGO_HEIGHT)
+        logo_range = logo_box.TextFrame.TextRange
+        logo_range.Text = "Updated live by Savi.ai"
+        logo_font = logo_range.Font
         logo_font.Size = 10
-        logo_font.Color.RGB = int("A0A0A0", 16)
+        logo_font.Color.RGB = WATERMARK_RGB
         
+        try:
+            visual_path = visual_future.result(timeout=VISUAL_TIMEOUT_S)
+        except Exception as e:
+            print(f"ERROR: Visual was not ready in time: {e}")
+            visual_path = None
+        if expects_visual and not visual_path:
+            # No visual after all: give the text the full slide width
+            title_box.Width = body_box.Width = _W_TEXT_WIDE
+            title_format.Alignment = ppAlignCenter
+
         # Add the visual if one was created
         if visual_path and os.path.exists(visual_path):
-            target_slide.Shapes.AddPicture(FileName=os.path.abspath(visual_path), LinkToFile=False, SaveWithDocument=True, 
-                                           Left=inch_to_points(6), Top=inch_to_points(2.5), 
-                                           Width=inch_to_points(3.5), Height=inch_to_points(3.5))
+            shapes.AddPicture(FileName=os.path.abspath(visual_path), LinkToFile=False, SaveWithDocument=True, 
+                              Left=_VISUAL_LEFT, Top=_VISUAL_TOP, 
+                              Width=_VISUAL_SIZE, Height=_VISUAL_SIZE)
+
+    def _clear_slide(self, target_slide):
+        """Deletes every shape on a slide, in a single COM call where possible."""
+        shapes = target_slide.Shapes
+        if shapes.Count == 0: return
+        try:
+            shapes.Range().Delete()  # No-arg Range() selects all shapes
+        except Exception:
+            for i in range(shapes.Count, 0, -1): shapes(i).Delete()
 
-    def insert_new_slide_after_current(self, slide_index, content_json, style_guide, visual_generator):
+    def insert_new_slide_after_current(self, slide_index, content_json, style_guide, visual_generator, visual_future=None):
         active_presentation = self._get_active_presentation()
         if not active_presentation: print("ERROR: Could not find active presentation."); return
         try:
             new_slide_index = slide_index + 1
             target_slide = active_presentation.Slides.Add(new_slide_index, ppLayoutBlank)
-            self._add_content_to_slide(target_slide, content_json, style_guide, visual_generator)
+            self._add_content_to_slide(target_slide, content_json, style_guide, visual_generator, visual_future)
             active_presentation.SlideShowWindow.View.GotoSlide(new_slide_index)
             active_presentation.Save()
         except Exception as e:
             print(f"ERROR: An error occurred during slide insertion: {e}")
 
-    def update_existing_slide(self, slide_index, content_json, style_guide, visual_generator):
+    def update_existing_slide(self, slide_index, content_json, style_guide, visual_generator, visual_future=None):
         active_presentation = self._get_active_presentation()
         if not active_presentation: print("ERROR: Could not find active presentation."); return
         try:
             target_slide = active_presentation.Slides(slide_index)
-            for i in range(target_slide.Shapes.Count, 0, -1): target_slide.Shapes(i).Delete()
-            self._add_content_to_slide(target_slide, content_json, style_guide, visual_generator)
+            self._clear_slide(target_slide)
+            self._add_content_to_slide(target_slide, content_json, style_guide, visual_generator, visual_future)
             active_presentation.SlideShowWindow.View.GotoSlide(slide_index)
             active_presentation.Save()
         except Exception as e:
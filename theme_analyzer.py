@@ -18,28 +18,77 @@ pip install python-pptx
 """
 
 import collections
+import mmap
+import os
 from pptx import Presentation
 from pptx.dml.color import RGBColor
 from pptx.enum.dml import MSO_THEME_COLOR
 from pptx.enum.shapes import PP_PLACEHOLDER
 
+# Placeholder type -> bucket ('t' for title-like, 'b' for body); other types are ignored.
+_BUCKET = {
+    PP_PLACEHOLDER.TITLE: 't',
+    PP_PLACEHOLDER.CENTER_TITLE: 't',
+    PP_PLACEHOLDER.SUBTITLE: 't',
+    PP_PLACEHOLDER.BODY: 'b',
+}
+
+def _mode(counter, default):
+    """Returns the most common value in a Counter (first seen wins ties), or default if it is empty."""
+    return max(counter, key=counter.get) if counter else default
+
+class _MappedFile(mmap.mmap):
+    """
+    A read-only memory map that zipfile accepts as a file object.
+    (mmap only gained seekable() in Python 3.13.)
+    """
+    def seekable(self):
+        return True
+
+def load_presentation(pptx_path):
+    """
+    Opens a .pptx file through a read-only memory map instead of buffered reads.
+
+    Args:
+        pptx_path (str): The file path to the PowerPoint presentation.
+
+    Returns:
+        Presentation: The parsed presentation.
+    """
+    fd = os.open(pptx_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        mapped = _MappedFile(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+    try:
+        if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        # python-pptx reads every part while opening, so the map can be released afterwards.
+        return Presentation(mapped)
+    finally:
+        mapped.close()
+
 class ThemeAnalyzer:
     """
     Analyzes a PowerPoint presentation to extract its theme and style information.
     """
     def __init__(self, pptx_path):
         """
-        Initializes the ThemeAnalyzer with the path to a .pptx file.
+        Initializes the ThemeAnalyzer with a .pptx file or an already parsed presentation.
 
         Args:
-            pptx_path (str): The file path to the PowerPoint presentation.
+            pptx_path (str or Presentation): The file path to the PowerPoint presentation,
+                or a presentation that has already been opened with python-pptx.
         """
-        try:
-            self.prs = Presentation(pptx_path)
-        except Exception as e:
-            print(f"Error opening presentation file: {e}")
-            self.prs = None
-            return
+        if isinstance(pptx_path, (str, os.PathLike)):
+            try:
+                self.prs = load_presentation(pptx_path)
+            except Exception as e:
+                print(f"Error opening presentation file: {e}")
+                self.prs = None
+                return
+        else:
+            self.prs = pptx_path
 
         self.title_font = None
         self.body_font = None
@@ -47,6 +96,16 @@ class ThemeAnalyzer:
         self.accent_color = None
         self._analyze_theme()
 
+    @classmethod
+    def from_presentation(cls, prs):
+        """
+        Creates a ThemeAnalyzer for a presentation that is already open, avoiding a second parse.
+
+        Args:
+            prs (Presentation): A presentation opened with python-pptx.
+        """
+        return cls(prs)
+
     def _analyze_theme(self):
         """
         Performs the analysis of the presentation's theme and styles.
@@ -55,58 +114,48 @@ class ThemeAnalyzer:
             print("Presentation contains no slide masters, cannot analyze theme.")
             return
 
-        title_fonts, body_fonts = [], []
-        title_font_sizes, body_font_sizes = [], []
-        title_colors, body_colors = [], []
-        
+        # One column of counts per attribute, per bucket.
+        columns = {bucket: {'name': collections.Counter(), 'size': collections.Counter(), 'color': collections.Counter()}
+                   for bucket in set(_BUCKET.values())}
+
         # Analyze slide masters for common fonts, sizes, and colors by checking placeholder types.
         for slide_master in self.prs.slide_masters:
             for placeholder in slide_master.placeholders:
-                # Check for various types of title placeholders
-                if placeholder.placeholder_format.type in [PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE, PP_PLACEHOLDER.SUBTITLE]:
-                    if hasattr(placeholder, 'text_frame') and placeholder.text_frame:
-                        font = placeholder.text_frame.paragraphs[0].font
-                        if font.name:
-                            title_fonts.append(font.name)
-                        if font.size:
-                            title_font_sizes.append(font.size.pt)
-                        # --- FIX: Check for .rgb attribute before accessing it ---
-                        if hasattr(font.color, 'rgb') and font.color.rgb is not None:
-                            title_colors.append(font.color.rgb)
-                
-                # Check for Body placeholders
-                elif placeholder.placeholder_format.type == PP_PLACEHOLDER.BODY:
-                     if hasattr(placeholder, 'text_frame') and placeholder.text_frame:
-                        font = placeholder.text_frame.paragraphs[0].font
-                        if font.name:
-                            body_fonts.append(font.name)
-                        if font.size:
-                            body_font_sizes.append(font.size.pt)
-                        # --- FIX: Check for .rgb attribute before accessing it ---
-                        if hasattr(font.color, 'rgb') and font.color.rgb is not None:
-                            body_colors.append(font.color.rgb)
+                # Only title-like and Body placeholders contribute to the style
+                bucket = _BUCKET.get(placeholder.placeholder_format.type)
+                if bucket is None:
+                    continue
+                text_frame = getattr(placeholder, 'text_frame', None)
+                if not text_frame:
+                    continue
+
+                column = columns[bucket]
+                font = text_frame.paragraphs[0].font
+                name, size, color = font.name, font.size, font.color
+                if name:
+                    column['name'][name] += 1
+                if size:
+                    column['size'][size.pt] += 1
+                # --- FIX: Check for .rgb attribute before accessing it ---
+                rgb = getattr(color, 'rgb', None)
+                if rgb is not None:
+                    column['color'][rgb] += 1
 
         # --- CORRECTED & ROBUST FONT/SIZE/COLOR DETERMINATION ---
-        title_font_counter = collections.Counter(title_fonts)
-        title_size_counter = collections.Counter(title_font_sizes)
-        body_font_counter = collections.Counter(body_fonts)
-        body_size_counter = collections.Counter(body_font_sizes)
-        title_color_counter = collections.Counter(title_colors)
-        body_color_counter = collections.Counter(body_colors)
-
+        title, body = columns['t'], columns['b']
         self.title_font = {
-            'name': title_font_counter.most_common(1)[0][0] if title_font_counter else 'Calibri',
-            'size': title_size_counter.most_common(1)[0][0] if title_size_counter else 32
+            'name': _mode(title['name'], 'Calibri'),
+            'size': _mode(title['size'], 32)
         }
         self.body_font = {
-            'name': body_font_counter.most_common(1)[0][0] if body_font_counter else 'Calibri',
-            'size': body_size_counter.most_common(1)[0][0] if body_size_counter else 18
+            'name': _mode(body['name'], 'Calibri'),
+            'size': _mode(body['size'], 18)
         }
         
         # The primary color is the most common title color.
-        self.primary_color = title_color_counter.most_common(1)[0][0] if title_color_counter else RGBColor(0, 0, 0)
+        self.primary_color = _mode(title['color'], RGBColor(0, 0, 0))
         # The accent color is the most common body text color.
-        self.accent_color = body_color_counter.most_common(1)[0][0] if body_color_counter else RGBColor(89, 89, 89)
+        self.accent_color = _mode(body['color'], RGBColor(89, 89, 89))
 
 
     def get_style(self):
@@ -9,53 +9,127 @@ handling both simple and multi-dataset bar charts.
 """
 
 import os
+import hashlib
+import itertools
+import shutil
+import threading
 import requests
-from thenounproject.api import Api
-import matplotlib.pyplot as plt
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Seconds to wait on Pexels / Noun Project before giving up on a visual
+REQUEST_TIMEOUT_S = 5
+# Charts are transient slide assets: render at screen DPI and favour fast PNG compression over size
+CHART_DPI = 96
+CHART_PNG_COMPRESS_LEVEL = 1
+# Downloaded images/icons, keyed by query, kept across runs (temp_visuals is wiped on cleanup)
+VISUAL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "savi_ai", "visuals")
 
 class VisualGenerator:
     def __init__(self, pexels_key, noun_key, noun_secret):
         self.pexels_key = pexels_key
-        self.noun_project = Api(noun_key, noun_secret)
+        self.noun_key = noun_key
+        self.noun_secret = noun_secret
+        # thenounproject and matplotlib are imported on first use; see _noun_api / _chart_figure
+        self._noun_project = None
+        self._fig = None
+        self._canvas = None
         self.temp_dir = "temp_visuals"
         if not os.path.exists(self.temp_dir):
             os.makedirs(self.temp_dir)
+        self._id = itertools.count()
+        self.cache_dir = VISUAL_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Shared session so repeated fetches reuse pooled keep-alive connections
+        self.sess = requests.Session()
+        self.sess.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=2))
+        self._chart_lock = threading.Lock()
+
+    def _noun_api(self):
+        if self._noun_project is None:
+            from thenounproject.api import Api
+            self._noun_project = Api(self.noun_key, self.noun_secret)
+        return self._noun_project
+
+    def _chart_figure(self):
+        """Returns the off-screen figure reused for every chart, creating it on first use. Call with _chart_lock held."""
+        if self._fig is None:
+            import matplotlib.style as mplstyle
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            mplstyle.use('seaborn-v0_8-whitegrid')
+            self._fig = Figure(figsize=(6, 4), dpi=CHART_DPI)
+            self._canvas = FigureCanvasAgg(self._fig)
+        return self._fig
 
-    def _save_temp_file(self, data, extension):
-        filename = f"temp_{int(plt.fignum_exists(1))}.{extension}"
-        path = os.path.join(self.temp_dir, filename)
-        with open(path, 'wb') as f:
-            f.write(data)
+    def _temp_path(self, extension):
+        """Returns a fresh temp file path, so earlier visuals are never overwritten."""
+        return os.path.join(self.temp_dir, f"temp_{next(self._id)}.{extension}")
+
+    def _cache_path(self, kind, query, extension):
+        key = hashlib.blake2b(query.encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{kind}_{key}.{extension}")
+
+    def _download_to_cache(self, url, path):
+        """Streams a download to disk without holding it in memory, then moves it into place atomically."""
+        part_path = f"{path}.{os.getpid()}_{next(self._id)}.part"
+        try:
+            with self.sess.get(url, stream=True, timeout=REQUEST_TIMEOUT_S) as r:
+                r.raise_for_status()
+                r.raw.decode_content = True
+                with open(part_path, 'wb') as f:
+                    shutil.copyfileobj(r.raw, f, length=65536)
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.unlink(part_path)
         return path
 
     def get_image(self, query):
         if not self.pexels_key or "YOUR_PEXELS_API_KEY" in self.pexels_key: return None
+        cached_path = self._cache_path('image', query, 'jpg')
+        if os.path.exists(cached_path): return cached_path
         headers = {"Authorization": self.pexels_key}
         url = f"https://api.pexels.com/v1/search?query={query}&per_page=1"
         try:
-            response = requests.get(url, headers=headers)
+            response = self.sess.get(url, headers=headers, timeout=REQUEST_TIMEOUT_S)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content) if orjson is not None else response.json()
             if data['photos']:
                 image_url = data['photos'][0]['src']['large']
-                image_data = requests.get(image_url).content
-                return self._save_temp_file(image_data, 'jpg')
+                return self._download_to_cache(image_url, cached_path)
         except Exception as e:
             print(f"ERROR: Failed to fetch image from Pexels: {e}")
         return None
 
     def get_icon(self, query):
-        if not self.noun_project.api_key or "YOUR_NOUN_PROJECT" in self.noun_project.api_key: return None
+        if not self.noun_key or "YOUR_NOUN_PROJECT" in self.noun_key: return None
+        cached_path = self._cache_path('icon', query, 'png')
+        if os.path.exists(cached_path): return cached_path
         try:
-            icons = self.noun_project.icon.list(query, limit=1)
+            icons = self._noun_api().icon.list(query, limit=1)
             if icons:
                 icon_url = icons[0].preview_url
-                icon_data = requests.get(icon_url).content
-                return self._save_temp_file(icon_data, 'png')
+                return self._download_to_cache(icon_url, cached_path)
         except Exception as e:
             print(f"ERROR: Failed to fetch icon from Noun Project: {e}")
         return None
 
+    def _get_icon_or_image(self, query):
+        """Returns an icon for the query, falling back to a Pexels image only if no icon is found."""
+        return self.get_icon(query) or self.get_image(query)
+
+    def get_visuals_batch(self, queries):
+        """Fetches visuals for several queries at once, preferring an icon over an image for each."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = {query: pool.submit(self._get_icon_or_image, query) for query in queries}
+            return {query: future.result() for query, future in futures.items()}
+
     def create_chart(self, chart_data):
         """Creates a bar or pie chart image from potentially complex data."""
         print(f"INFO: Generating chart with data: {chart_data}")
@@ -63,43 +137,51 @@ class VisualGenerator:
             labels = chart_data.get('labels', [])
             chart_type = chart_data.get('type', 'bar')
 
-            plt.style.use('seaborn-v0_8-whitegrid')
-            fig, ax = plt.subplots(figsize=(6, 4))
-            
-            if chart_type == 'pie':
-                values = chart_data.get('values', [])
-                ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=plt.cm.Paired.colors)
-                ax.axis('equal')
-            else: # Handle bar charts (simple or multi-dataset)
-                datasets = chart_data.get('datasets')
-                if datasets: # Multi-series bar chart
-                    for dataset in datasets:
-                        ax.bar(labels, dataset.get('data', []), label=dataset.get('label'))
-                    ax.legend()
-                else: # Simple bar chart
+            with self._chart_lock:
+                fig = self._chart_figure()
+                fig.clear()
+                ax = fig.add_subplot(111)
+
+                if chart_type == 'pie':
                     values = chart_data.get('values', [])
-                    ax.bar(labels, values, color='#4285F4')
-
-            ax.set_title(chart_data.get('title', 'Chart'), fontsize=14, weight='bold')
-            ax.tick_params(axis='x', rotation=45)
-            plt.tight_layout()
-            
-            chart_path = os.path.join(self.temp_dir, "temp_chart.png")
-            plt.savefig(chart_path)
-            plt.close(fig)
+                    from matplotlib import colormaps
+                    ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colormaps['Paired'].colors)
+                    ax.axis('equal')
+                else: # Handle bar charts (simple or multi-dataset)
+                    datasets = chart_data.get('datasets')
+                    if datasets: # Multi-series bar chart
+                        for dataset in datasets:
+                            ax.bar(labels, dataset.get('data', []), label=dataset.get('label'))
+                        ax.legend()
+                    else: # Simple bar chart
+                        values = chart_data.get('values', [])
+                        ax.bar(labels, values, color='#4285F4')
+
+                ax.set_title(chart_data.get('title', 'Chart'), fontsize=14, weight='bold')
+                ax.tick_params(axis='x', rotation=45)
+                fig.tight_layout()
+
+                chart_path = self._temp_path('png')
+                self._canvas.print_png(chart_path, pil_kwargs={'compress_level': CHART_PNG_COMPRESS_LEVEL})
             print(f"SUCCESS: Saved chart to {chart_path}")
             return chart_path
         except Exception as e:
             print(f"ERROR: Failed to create chart: {e}")
         return None
 
-    def cleanup_temp_files(self):
-        """Removes all files from the temporary visuals directory."""
+    def cleanup_temp_files(self, fast=False):
+        """Removes all files from the temporary visuals directory.
+
+        With fast=True the whole directory is removed and recreated instead."""
         print("INFO: Cleaning up temporary visual files...")
-        for filename in os.listdir(self.temp_dir):
-            file_path = os.path.join(self.temp_dir, filename)
-            try:
-                if os.path.isfile(file_path):
-                    os.unlink(file_path)
-            except Exception as e:
-                print(f"ERROR: Failed to delete temp file {file_path}: {e}")
+        if fast:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            os.makedirs(self.temp_dir, exist_ok=True)
+            return
+        with os.scandir(self.temp_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        os.unlink(entry.path)
+                except Exception as e:
+                    print(f"ERROR: Failed to delete temp file {entry.path}: {e}")
@@ -9,13 +9,20 @@ possible transcription quality.
 """
 
 import speech_recognition as sr
+import numpy as np
+import json
+import os
 import threading
-import time
+
+WHISPER_MODEL = "medium.en"
+# Last ambient-noise calibration, reused so startup skips the 1 s measurement
+NOISE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "savi_ai", "noise.json")
 
 class VoiceProcessor(threading.Thread):
-    def __init__(self, text_callback):
+    def __init__(self, text_callback, error_callback=None):
         """
         Initializes the VoiceProcessor for local speech recognition using Whisper.
+        error_callback, if given, receives a message when the listener cannot start.
         """
         super().__init__()
         self.daemon = True
@@ -23,46 +30,95 @@ class VoiceProcessor(threading.Thread):
         self.recognizer.dynamic_energy_threshold = True
         self.microphone = sr.Microphone()
         self.text_callback = text_callback
-        self.running = True
+        self.error_callback = error_callback
+        self._stop_evt = threading.Event()
+        self._model = None
 
     def run(self):
         """The main loop for the voice processing thread."""
         # --- CHANGE: Upgraded to the "medium.en" model ---
-        model_name = "small.en"
+        model_name = WHISPER_MODEL
         print(f"VoiceProcessor thread started. Using Whisper model: '{model_name}'...")
         print("NOTE: The first run will download the model (approx. 1.5 GB), which can take several minutes.")
+
+        # Load the model up front so the first utterance doesn't pay for it
+        try:
+            self._model = self._load_model(model_name)
+        except Exception as e:
+            print(f"ERROR: Could not load the Whisper model; {e}")
+            if self.error_callback: self.error_callback(f"Could not load the speech model: {e}")
+            return
+        # Stop may have been requested while the model was loading or downloading
+        if self._stop_evt.is_set(): return
         
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        if not self._load_noise_calibration():
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            self._save_noise_calibration()
+        if self._stop_evt.is_set(): return
         
         # Use listen_in_background for non-blocking audio capture
         stop_listening = self.recognizer.listen_in_background(self.microphone, self._audio_callback, phrase_time_limit=5)
 
-        while self.running:
-            time.sleep(0.5)
+        # Sleep until stop() is called, without periodic wake-ups
+        self._stop_evt.wait()
 
         print("Stopping voice listener...")
         stop_listening(wait_for_stop=False)
+        # Remember where the dynamic threshold settled for a warm start next time
+        self._save_noise_calibration()
         print("VoiceProcessor thread stopped.")
 
+    @staticmethod
+    def _load_model(model_name):
+        from faster_whisper import WhisperModel
+        try:
+            return WhisperModel(model_name, device="auto", compute_type="int8_float16")
+        except ValueError:
+            # No float16 support (e.g. CPU only): fall back to plain int8
+            return WhisperModel(model_name, device="cpu", compute_type="int8")
+
+    def _load_noise_calibration(self):
+        """Applies the saved energy threshold if it was measured on this microphone."""
+        try:
+            with open(NOISE_CACHE_PATH, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('device') != str(self.microphone.device_index):
+                return False
+            self.recognizer.energy_threshold = float(saved['threshold'])
+            self.recognizer.dynamic_energy_threshold = True
+            print(f"Using saved ambient noise calibration (threshold {self.recognizer.energy_threshold:.0f}).")
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def _save_noise_calibration(self):
+        try:
+            os.makedirs(os.path.dirname(NOISE_CACHE_PATH), exist_ok=True)
+            with open(NOISE_CACHE_PATH, 'w', encoding='utf-8') as f:
+                json.dump({'device': str(self.microphone.device_index),
+                           'threshold': self.recognizer.energy_threshold}, f)
+        except OSError as e:
+            print(f"Could not save ambient noise calibration; {e}")
+
     def _audio_callback(self, recognizer, audio):
         """
-        Callback to transcribe audio using the Whisper 'medium.en' model and
-        send the resulting text to the main application thread.
+        Callback to transcribe audio using the preloaded faster-whisper 'medium.en'
+        model and send the resulting text to the main application thread.
         """
         try:
-            # --- CHANGE: Using the more accurate "medium.en" model ---
-            text = recognizer.recognize_whisper(audio, language="english", model="medium.en")
+            # Whisper expects 16 kHz mono float32 samples in [-1, 1]
+            raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
+            samples = np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+            # The VAD filter skips silent stretches instead of decoding them
+            segments, _ = self._model.transcribe(samples, language="en", beam_size=1, vad_filter=True)
+            text = "".join(segment.text for segment in segments).strip()
             print(f"Transcribed: '{text}'")
-            if text.strip():
+            if text:
                 self.text_callback(text)
-        except sr.UnknownValueError:
-            # This is normal if there's silence or unrecognizable speech.
-            pass
-        except sr.RequestError as e:
-            # This error is unlikely with local Whisper but good practice to keep.
-            print(f"Could not request results from Whisper engine; {e}")
+        except Exception as e:
+            print(f"Could not transcribe audio with Whisper; {e}")
 
     def stop(self):
         """Signals the thread to stop running."""
-        self.running = False
+        self._stop_evt.set()